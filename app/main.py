@@ -1,6 +1,6 @@
 import logging
 import os
-from datetime import datetime
+from datetime import date
 
 from fastapi import FastAPI, Form, Request
 from fastapi.middleware.gzip import GZipMiddleware
@@ -11,7 +11,14 @@ from pydantic import ValidationError
 from starlette.middleware.sessions import SessionMiddleware
 
 from .models import DateData, DateInterval
-from .session import get_session_store, save_to_session
+from .session import (
+    add_to_session,
+    find_in_session,
+    get_session_store,
+    remove_from_session,
+    replace_in_session,
+    save_to_session,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +48,8 @@ app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory="templates")
+# 只在開發模式檢查模板檔案是否變更，正式環境直接使用已編譯的快取
+templates.env.auto_reload = DEBUG
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -48,7 +57,7 @@ async def get_date_calculator(request: Request):
     """日期計算機主頁面"""
     store = get_session_store(request)
 
-    context = {"request": request, "store": store, "current_date": datetime.now().date().strftime("%Y-%m-%d")}
+    context = {"request": request, "store": store, "current_date": date.today().isoformat()}
 
     return templates.TemplateResponse("date_calculator/index.html", context)
 
@@ -78,9 +87,7 @@ async def calculate_date(
         result = DateData.calculate_date(data)
 
         # Add to session store (prepend for newest first)
-        store = get_session_store(request)
-        store.insert(0, result)
-        save_to_session(request, store)
+        add_to_session(request, result)
 
         context = {"request": request, "date_data": result}
 
@@ -131,9 +138,7 @@ async def calculate_interval(request: Request, start_date: str = Form(...), end_
         )
 
         # Add to session store (prepend for newest first)
-        store = get_session_store(request)
-        store.insert(0, result)
-        save_to_session(request, store)
+        add_to_session(request, result)
 
         context = {"request": request, "interval_data": result}
 
@@ -151,7 +156,7 @@ async def delete_all_calculations(request: Request):
 
         return HTMLResponse(content="")
     except Exception as e:
-        logger.error(f"Error deleting all calculations: {e}")
+        logger.error("Error deleting all calculations: %s", e)
         return HTMLResponse(content="", status_code=500)
 
 
@@ -159,13 +164,11 @@ async def delete_all_calculations(request: Request):
 async def delete_date_calculation(request: Request, id: str):
     """刪除單個計算記錄"""
     try:
-        store = get_session_store(request)
-        updated_store = [data for data in store if data.id != id]
-        save_to_session(request, updated_store)
+        remove_from_session(request, id)
 
         return HTMLResponse(content="")
     except Exception as e:
-        logger.error(f"Error deleting calculation: {e}")
+        logger.error("Error deleting calculation: %s", e)
         return HTMLResponse(content="", status_code=500)
 
 
@@ -173,51 +176,28 @@ async def delete_date_calculation(request: Request, id: str):
 async def save_description(request: Request, id: str, description: str = Form("")):
     """儲存描述"""
     try:
-        store = get_session_store(request)
-
-        # 找到並更新描述
-        for i, data in enumerate(store):
-            if data.id == id:
-                # 根據數據類型創建新物件，利用 BaseModel 的驗證
-                if isinstance(data, DateData):
-                    updated_data = DateData(
-                        id=data.id,
-                        base_date=data.base_date,
-                        operation=data.operation,
-                        amount=data.amount,
-                        unit=data.unit,
-                        result=data.result,
-                        description=description,  # 會被 DateData 的 sanitize_description 驗證
-                    )
-                elif isinstance(data, DateInterval):
-                    updated_data = DateInterval(
-                        id=data.id,
-                        start_date=data.start_date,
-                        end_date=data.end_date,
-                        days_diff=data.days_diff,
-                        description=description,
-                    )
-                else:
-                    continue
-
-                store[i] = updated_data
-                save_to_session(request, store)
-
-                # 返回更新後的單個卡片
-                context = {
-                    "request": request,
-                    "date_data": updated_data if isinstance(updated_data, DateData) else None,
-                    "interval_data": updated_data if isinstance(updated_data, DateInterval) else None,
-                }
-
-                template_name = (
-                    "date_calculator/result_card.html"
-                    if isinstance(updated_data, DateData)
-                    else "date_calculator/interval_result_card.html"
-                )
-                return templates.TemplateResponse(template_name, context)
-
-        return HTMLResponse(content="error", status_code=404)
+        data = find_in_session(request, id)
+        if data is None:
+            return HTMLResponse(content="error", status_code=404)
+
+        # DateData 啟用 validate_assignment，只驗證 description（經 sanitize_description），不重建整個模型
+        # DateInterval 的週數、月數與描述無關，直接更新即可
+        data.description = description
+        replace_in_session(request, data)
+
+        # 返回更新後的單個卡片
+        context = {
+            "request": request,
+            "date_data": data if isinstance(data, DateData) else None,
+            "interval_data": data if isinstance(data, DateInterval) else None,
+        }
+
+        template_name = (
+            "date_calculator/result_card.html"
+            if isinstance(data, DateData)
+            else "date_calculator/interval_result_card.html"
+        )
+        return templates.TemplateResponse(template_name, context)
 
     except ValidationError:
         return HTMLResponse(content="error: invalid description", status_code=400)
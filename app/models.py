@@ -1,16 +1,44 @@
 import json
-import uuid
-from datetime import date, datetime, timedelta
+import re
+import secrets
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+def _new_id() -> str:
+    """產生 16 字元十六進位 ID（64 位元隨機值，只需在單一 session 內不重複）"""
+    return secrets.token_hex(8)
+
+
+# 固定天數的推算單位；months 另以年月換算
+_DAYS_PER_UNIT = {"days": 1, "weeks": 7}
+
+# 表單日期格式 YYYY-MM-DD，預先編譯以取代每次呼叫 strptime
+_FORM_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+def _parse_form_date(value: str) -> date:
+    """解析表單日期字串，格式錯誤或日期不存在時拋出 ValueError"""
+    if not _FORM_DATE_RE.fullmatch(value):
+        raise ValueError("Date must be in YYYY-MM-DD format")
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format")
 
 
 class DateData(BaseModel):
+    # 更新單一欄位（如描述）時只驗證該欄位
+    model_config = ConfigDict(validate_assignment=True)
+
     id: str = Field(..., max_length=100, description="Calculation ID")
     base_date: date = Field(..., description="Base date for calculation")
-    operation: str = Field(..., pattern="^(before|after)$", description="Must be 'before' or 'after'")
+    operation: Literal["before", "after"] = Field(..., description="Must be 'before' or 'after'")
     amount: int = Field(..., ge=1, le=3650, description="Amount between 1 and 3650")
-    unit: str = Field(..., pattern="^(days|weeks|months)$", description="Must be 'days', 'weeks', or 'months'")
+    unit: Literal["days", "weeks", "months"] = Field(..., description="Must be 'days', 'weeks', or 'months'")
     result: date = Field(..., description="Calculated result date")
     description: str = Field("", max_length=500, description="Description text, max 500 characters")
 
@@ -22,14 +50,14 @@ class DateData(BaseModel):
             # Strip whitespace and limit length
             v = v.strip()[:500]
             # Remove control characters but keep basic punctuation
-            v = "".join(char for char in v if char.isprintable() or char.isspace())
+            # 大多數描述本身就是可列印字元，先用 C 層級的 isprintable 整串檢查，避免逐字元重建
+            if not v.isprintable():
+                v = "".join(char for char in v if char.isprintable() or char.isspace())
         return v
 
     def to_dict(self) -> dict:
-        # 使用 Pydantic 的 model_dump，但自定義日期格式
-        data = self.model_dump()
-        data["base_date"] = self.base_date.strftime("%Y-%m-%d")
-        data["result"] = self.result.strftime("%Y-%m-%d")
+        # JSON 模式由 pydantic-core 直接輸出 YYYY-MM-DD 日期字串，不需再逐欄轉換
+        data = self.model_dump(mode="json")
         data["type"] = "calculation"  # 標記為日期推算類型
         return data
 
@@ -40,10 +68,11 @@ class DateData(BaseModel):
     def from_dict(cls, data: dict) -> "DateData":
         # 解析日期字串
         parsed_data = data.copy()
-        parsed_data["base_date"] = datetime.strptime(data["base_date"], "%Y-%m-%d").date()
-        parsed_data["result"] = datetime.strptime(data["result"], "%Y-%m-%d").date()
+        parsed_data["base_date"] = date.fromisoformat(data["base_date"])
+        parsed_data["result"] = date.fromisoformat(data["result"])
         parsed_data.pop("type", None)  # 移除類型標記
-        return cls(**parsed_data)
+        # 資料來自 to_dict 寫入的已簽章 session，建立時已驗證過，不再重跑驗證
+        return cls.model_construct(**parsed_data)
 
     @classmethod
     def from_json(cls, json_str: str) -> "DateData":
@@ -56,86 +85,76 @@ class DateData(BaseModel):
     ) -> "DateData":
         """從表單輸入創建 DateData，包含日期字串驗證和轉換"""
         # 驗證日期格式
-        try:
-            base_date_obj = datetime.strptime(base_date, "%Y-%m-%d").date()
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
+        base_date_obj = _parse_form_date(base_date)
 
         # 處理新計算的 ID
         calc_id = id
         if calc_id == "new_calc":
-            calc_id = str(uuid.uuid4().hex)
-
-        return cls(
-            id=calc_id,
-            base_date=base_date_obj,
-            operation=operation,
-            amount=amount,
-            unit=unit,
-            result=base_date_obj,  # Will be calculated
-            description=description,
+            calc_id = _new_id()
+
+        # 表單值未經檢查，交給 model_validate 驗證 operation / unit 等欄位
+        return cls.model_validate(
+            {
+                "id": calc_id,
+                "base_date": base_date_obj,
+                "operation": operation,
+                "amount": amount,
+                "unit": unit,
+                "result": base_date_obj,  # Will be calculated
+                "description": description,
+            }
         )
 
     @classmethod
     def calculate_date(cls, data: "DateData") -> "DateData":
-        if data.unit == "days":
-            delta = timedelta(days=data.amount)
-        elif data.unit == "weeks":
-            delta = timedelta(weeks=data.amount)
-        elif data.unit == "months":
-            # More accurate month calculation
+        if data.unit == "months":
+            # More accurate month calculation: 直接換算目標年月，不逐月迭代
+            months = data.amount if data.operation == "after" else -data.amount
+            year, month_index = divmod(data.base_date.year * 12 + data.base_date.month - 1 + months, 12)
+            result_date = data.base_date.replace(year=year, month=month_index + 1)
+        else:
+            delta = timedelta(days=data.amount * _DAYS_PER_UNIT.get(data.unit, 30))
+
             if data.operation == "after":
-                result_date = data.base_date
-                for _ in range(data.amount):
-                    if result_date.month == 12:
-                        result_date = result_date.replace(year=result_date.year + 1, month=1)
-                    else:
-                        result_date = result_date.replace(month=result_date.month + 1)
-                return cls(
-                    id=str(uuid.uuid4().hex),
-                    base_date=data.base_date,
-                    operation=data.operation,
-                    amount=data.amount,
-                    unit=data.unit,
-                    result=result_date,
-                    description=data.description,
-                )
+                result_date = data.base_date + delta
             else:
-                result_date = data.base_date
-                for _ in range(data.amount):
-                    if result_date.month == 1:
-                        result_date = result_date.replace(year=result_date.year - 1, month=12)
-                    else:
-                        result_date = result_date.replace(month=result_date.month - 1)
-                return cls(
-                    id=str(uuid.uuid4().hex),
-                    base_date=data.base_date,
-                    operation=data.operation,
-                    amount=data.amount,
-                    unit=data.unit,
-                    result=result_date,
-                    description=data.description,
-                )
-        else:
-            delta = timedelta(days=data.amount * 30)
+                result_date = data.base_date - delta
 
-        if data.operation == "after":
-            result_date = data.base_date + delta
-        else:
-            result_date = data.base_date - delta
+        # data 已通過驗證，只替換 id 與結果，不重跑整個模型驗證
+        return data.model_copy(update={"id": _new_id(), "result": result_date})
 
-        return cls(
-            id=str(uuid.uuid4()),
-            base_date=data.base_date,
-            operation=data.operation,
-            amount=data.amount,
-            unit=data.unit,
-            result=result_date,
-            description=data.description,
-        )
+
+# 每次請求都會從 session 重建 DateInterval，相同日期區間的結果直接快取
+@lru_cache(maxsize=256)
+def _month_span(calc_start: date, calc_end: date) -> tuple[int, int]:
+    """計算 calc_start 到 calc_end 的完整月數與餘數天數"""
+    # 直接以年月差計算完整月數：結束日的「日」尚未到起始日的「日」時，最後一個月不算完整
+    months_full = (calc_end.year - calc_start.year) * 12 + calc_end.month - calc_start.month
+    if calc_end.day < calc_start.day:
+        months_full -= 1
+
+    # 從起始日往後推 months_full 個月的同一天，剩下的即為餘數天數
+    year, month_index = divmod(calc_start.year * 12 + calc_start.month - 1 + months_full, 12)
+    current_date = calc_start.replace(year=year, month=month_index + 1)
+
+    return months_full, (calc_end - current_date).days
 
 
 class DateInterval:
+    __slots__ = (
+        "id",
+        "start_date",
+        "end_date",
+        "days_diff",
+        "description",
+        "weeks_full",
+        "weeks_remainder_days",
+        "months_full",
+        "months_remainder_days",
+        "weeks_approx",
+        "months_approx",
+    )
+
     def __init__(self, id: str, start_date: date, end_date: date, days_diff: int, description: str = ""):
         self.id = id
         self.start_date = start_date
@@ -156,26 +175,8 @@ class DateInterval:
         else:
             calc_start, calc_end = end_date, start_date
 
-        # 計算實際月份差異
-        self.months_full = 0
-        current_date = calc_start
-
-        while True:
-            # 計算下個月的同一天
-            if current_date.month == 12:
-                next_month = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                next_month = current_date.replace(month=current_date.month + 1)
-
-            # 如果下個月超過結束日期，停止計算
-            if next_month > calc_end:
-                break
-
-            self.months_full += 1
-            current_date = next_month
-
-        # 計算月數的餘數天數
-        self.months_remainder_days = (calc_end - current_date).days
+        # 計算實際月份差異與餘數天數
+        self.months_full, self.months_remainder_days = _month_span(calc_start, calc_end)
 
         # 保留原有的概算值以便向後相容
         self.weeks_approx = self.weeks_full
@@ -184,15 +185,10 @@ class DateInterval:
     def to_dict(self) -> dict:
         return {
             "id": self.id,
-            "start_date": self.start_date.strftime("%Y-%m-%d"),
-            "end_date": self.end_date.strftime("%Y-%m-%d"),
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
             "days_diff": self.days_diff,
-            "weeks_approx": self.weeks_approx,
-            "months_approx": self.months_approx,
-            "weeks_full": self.weeks_full,
-            "weeks_remainder_days": self.weeks_remainder_days,
-            "months_full": self.months_full,
-            "months_remainder_days": self.months_remainder_days,
+            # 週數、月數等衍生值由 __init__ 重新計算，不寫入 session 以節省 cookie 空間
             "description": self.description,
             "type": "interval",  # 標記為間隔計算類型
         }
@@ -204,8 +200,8 @@ class DateInterval:
     def from_dict(cls, data: dict) -> "DateInterval":
         return cls(
             id=data["id"],
-            start_date=datetime.strptime(data["start_date"], "%Y-%m-%d").date(),
-            end_date=datetime.strptime(data["end_date"], "%Y-%m-%d").date(),
+            start_date=date.fromisoformat(data["start_date"]),
+            end_date=date.fromisoformat(data["end_date"]),
             days_diff=data["days_diff"],
             description=data.get("description", ""),
         )
@@ -221,7 +217,7 @@ class DateInterval:
         days_diff = (end_date - start_date).days
 
         return cls(
-            id=str(uuid.uuid4().hex),
+            id=_new_id(),
             start_date=start_date,
             end_date=end_date,
             days_diff=days_diff,
@@ -232,10 +228,7 @@ class DateInterval:
     def from_form_input(cls, start_date: str, end_date: str, description: str = "") -> "DateInterval":
         """從表單輸入創建 DateInterval，包含日期字串驗證和轉換"""
         # 驗證日期格式
-        try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
+        start_date_obj = _parse_form_date(start_date)
+        end_date_obj = _parse_form_date(end_date)
 
         return cls.calculate_interval(start_date_obj, end_date_obj, description)
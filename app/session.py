@@ -1,33 +1,93 @@
 import json
-from typing import List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi import Request
 
 from .models import DateData, DateInterval
 
 
+def _load_item(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Decode a stored calculation entry"""
+    # 舊版 session 以 JSON 字串儲存每筆記錄，新版直接存 dict
+    return json.loads(item) if isinstance(item, str) else item
+
+
+def _to_model(data: Dict[str, Any]) -> Union[DateData, DateInterval]:
+    """Build the model for a decoded calculation entry"""
+    # 根據類型標記決定使用哪個類別
+    if data.get("type") == "interval":
+        return DateInterval.from_dict(data)
+    return DateData.from_dict(data)
+
+
 def get_session_store(request: Request) -> List[Union[DateData, DateInterval]]:
     """Get date calculations from session"""
-    if not hasattr(request, "session"):
+    if "session" not in request.scope:
         return []
 
-    store_json = request.session.get("date_store", [])
-    results = []
-
-    for json_str in store_json:
-        data = json.loads(json_str)
-        # 根據類型標記決定使用哪個類別
-        if data.get("type") == "interval":
-            results.append(DateInterval.from_dict(data))
-        else:
-            results.append(DateData.from_dict(data))
+    raw_store = request.session.get("date_store")
+    if not raw_store:
+        return []
 
-    return results
+    return [_to_model(_load_item(item)) for item in raw_store]
 
 
 def save_to_session(request: Request, store: List[Union[DateData, DateInterval]]):
     """Save date calculations to session"""
-    if not hasattr(request, "session"):
+    if "session" not in request.scope:
+        return
+
+    # SessionMiddleware 會整體序列化一次，這裡不需先逐筆 json.dumps
+    request.session["date_store"] = [data.to_dict() for data in store]
+
+
+def add_to_session(request: Request, record: Union[DateData, DateInterval]) -> None:
+    """Prepend a new date calculation to session (newest first)"""
+    if "session" not in request.scope:
+        return
+
+    # 既有記錄維持原本的 dict，只序列化新增的這一筆
+    raw_store = request.session.get("date_store") or []
+    request.session["date_store"] = [record.to_dict(), *(_load_item(item) for item in raw_store)]
+
+
+def remove_from_session(request: Request, id: str) -> None:
+    """Remove a date calculation from session by id"""
+    if "session" not in request.scope:
+        return
+
+    raw_store = request.session.get("date_store")
+    if not raw_store:
+        return
+
+    # 只需比對 id，不必把每筆記錄還原成模型再重新序列化
+    entries = [_load_item(item) for item in raw_store]
+    request.session["date_store"] = [data for data in entries if data.get("id") != id]
+
+
+def find_in_session(request: Request, id: str) -> Optional[Union[DateData, DateInterval]]:
+    """Get a single date calculation from session by id"""
+    if "session" not in request.scope:
+        return None
+
+    # 只還原符合 id 的那一筆記錄
+    for item in request.session.get("date_store") or []:
+        data = _load_item(item)
+        if data.get("id") == id:
+            return _to_model(data)
+
+    return None
+
+
+def replace_in_session(request: Request, record: Union[DateData, DateInterval]) -> None:
+    """Replace the stored date calculation that has the same id"""
+    if "session" not in request.scope:
+        return
+
+    raw_store = request.session.get("date_store")
+    if not raw_store:
         return
 
-    request.session["date_store"] = [data.to_json() for data in store]
+    # 其餘記錄維持原本的 dict，不需重新序列化
+    entries = [_load_item(item) for item in raw_store]
+    request.session["date_store"] = [record.to_dict() if data.get("id") == record.id else data for data in entries]